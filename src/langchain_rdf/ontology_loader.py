@@ -1,8 +1,36 @@
-from typing import Any, List, Optional
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, Optional
+from urllib.request import Request, urlopen
 
 from langchain_core.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 from rdflib import Graph
+from rdflib.namespace import DC, DCTERMS, OWL, RDF, RDFS, SKOS
+
+# Extracted documents are cached on disk per ontology URL and ETag/Last-Modified
+_CACHE_DIR = Path.home() / ".cache" / "langchain-rdf"
+
+# Types of entities extracted from the ontology, and predicates providing their labels
+ENTITY_TYPES = (OWL.Class, RDFS.Class, OWL.NamedIndividual, OWL.DatatypeProperty, OWL.ObjectProperty)
+LABEL_PREDICATES = frozenset(
+    {
+        RDFS.label,
+        SKOS.prefLabel,
+        SKOS.altLabel,
+        SKOS.definition,
+        RDFS.comment,
+        DCTERMS.description,
+        DC.title,
+    }
+)
+# The same type and predicate terms recur for every extracted document,
+# convert them to strings once instead of per row
+_ENTITY_TYPE_STRS = {entity_type: str(entity_type) for entity_type in ENTITY_TYPES}
+_LABEL_PREDICATE_STRS = {pred: str(pred) for pred in LABEL_PREDICATES}
 
 
 class OntologyLoader(BaseLoader):
@@ -10,98 +38,102 @@ class OntologyLoader(BaseLoader):
     Load an OWL ontology and extract classes and properties as documents.
     """
 
-    def __init__(self, ontology_url: str, format: Optional[str] = None):
+    def __init__(
+        self, ontology_url: str, format: Optional[str] = None, store: str = "default", use_cache: bool = True
+    ):
         """
         Initialize the OntologyLoader.
 
         Args:
             ontology_url (str): URL of the OWL ontology to be loaded.
             format (str): Format of the OWL ontology to be loaded.
+            store (str): rdflib store used for the graph, e.g. "Oxigraph" for large ontologies
+                (requires the oxrdflib package).
+            use_cache (bool): Cache the extracted documents on disk, keyed on the ontology
+                URL and its ETag/Last-Modified. Disabling it also skips the HEAD request
+                probing the ontology version.
         """
         self.ontology_url = ontology_url
         self.format = format
-        self.graph = Graph(store="Oxigraph")
-        self.graph.parse(self.ontology_url, format=self.format)
-
-    def load(self) -> List[Document]:
-        """Load and return documents (classes and properties) from the OWL ontology."""
-        # Extract classes and properties as documents
-        docs: List[Document] = []
-        for cls in self.graph.query(self._get_class_query()):
-            docs.append(self._create_document(cls))
-        for prop in self.graph.query(self._get_property_query()):
-            docs.append(self._create_document(prop))
-        return docs
+        self.cache_path = self._get_cache_path() if use_cache else None
+        self.graph = Graph(store=store)
+        self._parsed = False
+        # Skip the download and parse entirely when cached documents are available
+        if not (self.cache_path and self.cache_path.exists()):
+            self._parse_ontology()
 
-    def _create_document(self, result_row: Any) -> Document:
-        """Create a Document object from a query result row."""
-        label = str(result_row.label)
-        return Document(
-            page_content=label,
-            metadata={
-                "label": label,
-                "uri": str(result_row.uri),
-                "type": str(result_row.type),
-                "predicate": str(result_row.pred),
-                "ontology": self.ontology_url,
-            },
-        )
+    def _parse_ontology(self) -> None:
+        """Download and parse the ontology into the graph, once."""
+        if not self._parsed:
+            self.graph.parse(self.ontology_url, format=self.format)
+            self._parsed = True
 
-    def _get_class_query(self) -> str:
-        """Query to extract class labels"""
-        return """PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-            PREFIX rdfs:  <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX owl:  <http://www.w3.org/2002/07/owl#>
-            PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-            PREFIX dc: <http://purl.org/dc/elements/1.1/>
-            PREFIX dcterms: <http://purl.org/dc/terms/>
+    def _get_cache_path(self) -> Optional[Path]:
+        """Path of the documents cache for the current version of the ontology, if versionable."""
+        if not self.ontology_url.startswith(("http://", "https://")):
+            return None
+        try:
+            with urlopen(Request(self.ontology_url, method="HEAD")) as resp:  # noqa: S310
+                version = resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+        except (OSError, ValueError):
+            return None
+        if not version:
+            return None
+        key = hashlib.sha256(f"{self.ontology_url}|{version}".encode()).hexdigest()
+        return _CACHE_DIR / f"{key}.pkl"
 
-            SELECT ?uri ?pred ?label ?type
-            WHERE {
-                ?uri a ?type ;
-                    ?pred ?label .
-                FILTER (
-                    ?type = owl:Class ||
-                    ?type = rdfs:Class ||
-                    ?type = owl:NamedIndividual
-                )
-                FILTER (
-                    ?pred = rdfs:label ||
-                    ?pred = skos:prefLabel ||
-                    ?pred = skos:altLabel ||
-                    ?pred = skos:definition ||
-                    ?pred = rdfs:comment ||
-                    ?pred = dcterms:description ||
-                    ?pred = dc:title
-                )
-            }
-        """
+    def lazy_load(self) -> Iterator[Document]:
+        """Lazily load documents (classes and properties) from the OWL ontology."""
+        if self.cache_path and self.cache_path.exists():
+            try:
+                with open(self.cache_path, "rb") as f:
+                    cached_docs: List[Document] = pickle.load(f)  # noqa: S301
+            except (pickle.UnpicklingError, EOFError, AttributeError, OSError):
+                # Treat a corrupt or unreadable cache file as a miss and re-extract
+                pass
+            else:
+                yield from cached_docs
+                return
+        # The parse is skipped at init when a cache file exists, so it may still be needed here
+        self._parse_ontology()
+        docs: List[Document] = []
+        for doc in self._extract_documents():
+            docs.append(doc)
+            yield doc
+        if self.cache_path:
+            _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file then rename, so an interrupted run never leaves a partial cache
+            fd, tmp_path = tempfile.mkstemp(dir=_CACHE_DIR, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(docs, f)
+            os.replace(tmp_path, self.cache_path)
 
-    def _get_property_query(self) -> str:
-        """Query to extract property labels"""
-        return """PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-            PREFIX rdfs:  <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX owl:  <http://www.w3.org/2002/07/owl#>
-            PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-            PREFIX dc: <http://purl.org/dc/elements/1.1/>
-            PREFIX dcterms: <http://purl.org/dc/terms/>
+    def _extract_documents(self) -> Iterator[Document]:
+        """Extract class and property documents from the parsed ontology graph."""
+        # Iterate triple patterns directly, the store resolves them from its indexes
+        # without going through the SPARQL parser and planner. Documents are built
+        # inline to avoid a method call and repeated str() of the loop constants
+        for entity_type in ENTITY_TYPES:
+            type_str = _ENTITY_TYPE_STRS[entity_type]
+            for uri in self.graph.subjects(RDF.type, entity_type):
+                uri_str = str(uri)
+                # One scan over the subject's triples with a frozenset membership
+                # test, instead of one indexed lookup per label predicate
+                for pred, label in self.graph.predicate_objects(uri):
+                    if pred in LABEL_PREDICATES:
+                        pred_str = _LABEL_PREDICATE_STRS[pred]
+                        label_str = str(label)
+                        yield Document(
+                            page_content=label_str,
+                            metadata={
+                                "label": label_str,
+                                "uri": uri_str,
+                                "type": type_str,
+                                "predicate": pred_str,
+                                "ontology": self.ontology_url,
+                            },
+                        )
 
-            SELECT ?uri ?pred ?label ?type
-            WHERE {
-                ?uri a ?type ;
-                    ?pred ?label .
-                FILTER (
-                    ?type = owl:DatatypeProperty ||
-                    ?type = owl:ObjectProperty
-                )
-                FILTER (
-                    ?pred = rdfs:label ||
-                    ?pred = skos:prefLabel ||
-                    ?pred = skos:altLabel ||
-                    ?pred = skos:definition ||
-                    ?pred = rdfs:comment ||
-                    ?pred = dcterms:description ||
-                    ?pred = dc:title
-                )
-            }
-        """
+    def load(self) -> List[Document]:
+        """Load and return documents (classes and properties) from the OWL ontology."""
+        return list(self.lazy_load())
@@ -1,12 +1,47 @@
 import re
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Tuple
+from urllib.error import HTTPError, URLError
 
 from langchain_core.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 from rdflib import Graph
-from rdflib.plugins.sparql import prepareQuery
 from rdflib.plugins.stores import sparqlstore
 
+# Match the query form after any leading comments, BASE and PREFIX declarations
+_QUERY_TYPE_PATTERN = re.compile(
+    r"\A\s*(?:(?:#[^\n]*|PREFIX\s+\S*\s*<[^>]*>|BASE\s*<[^>]*>)\s*)*(SELECT|ASK|CONSTRUCT|DESCRIBE)",
+    re.IGNORECASE,
+)
+# Same names as the rdflib algebra previously stored in the query_type metadata
+_QUERY_TYPES = {
+    "SELECT": "SelectQuery",
+    "ASK": "AskQuery",
+    "CONSTRUCT": "ConstructQuery",
+    "DESCRIBE": "DescribeQuery",
+}
+
+
+# Query to extract SPARQL query examples
+_SPARQL_EXAMPLES_QUERY = """PREFIX sh: <http://www.w3.org/ns/shacl#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+SELECT ?comment ?query
+WHERE {
+    ?sq a sh:SPARQLExecutable ;
+        rdfs:label|rdfs:comment ?comment ;
+        sh:select|sh:ask|sh:construct|sh:describe ?query .
+}"""
+
+# Query to extract prefixes
+_PREFIXES_QUERY = """PREFIX sh: <http://www.w3.org/ns/shacl#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT DISTINCT ?prefix ?namespace
+WHERE {
+    [] sh:namespace ?namespace ;
+        sh:prefix ?prefix .
+} ORDER BY ?prefix"""
+
 
 class SparqlExamplesLoader(BaseLoader):
     """
@@ -23,70 +58,65 @@ class SparqlExamplesLoader(BaseLoader):
         self.endpoint_url = endpoint_url
         store = sparqlstore.SPARQLStore(query_endpoint=endpoint_url, auth=None)
         self.graph = Graph(store, identifier=None, bind_namespaces="none")
-        self.atag_pattern = re.compile(r"<a\b[^>]*>(.*?)<\/a>", re.IGNORECASE)
-        try:
-            self.graph.query("ASK { ?s ?p ?o }")
-        except ValueError as e:
-            raise ValueError(f"Could not query the provided endpoint at {endpoint_url}: {e}") from e
+        self.atag_pattern = re.compile(r"<a\b[^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL)
 
-    def load(self) -> List[Document]:
-        """Load and return documents (classes and properties) from the SPARQL endpoint."""
-        # Extract classes and properties as documents
-        docs: List[Document] = []
+    def lazy_load(self) -> Iterator[Document]:
+        """Lazily load documents (SPARQL query examples) from the SPARQL endpoint."""
+        # The prefixes and examples queries are independent, overlap their network round trips
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            prefix_rows = executor.submit(lambda: list(self.graph.query(_PREFIXES_QUERY)))
+            example_rows = executor.submit(lambda: list(self.graph.query(_SPARQL_EXAMPLES_QUERY)))
+        try:
+            prefix_rows.result()
+            example_rows.result()
+        except (ValueError, HTTPError, URLError) as e:
+            raise ValueError(f"Could not query the provided endpoint at {self.endpoint_url}: {e}") from e
 
-        # Get prefixes
+        # Get prefixes, serialized once as a preamble ready to prepend to the queries
         prefix_map: Dict[str, str] = {}
         row: Any
-        for row in self.graph.query(self._get_prefixes_query()):
+        for row in prefix_rows.result():
             prefix_map[str(row.prefix)] = str(row.namespace)
+        preamble = "".join(f"PREFIX {prefix}: <{namespace}>\n" for prefix, namespace in prefix_map.items())
 
-        for row in self.graph.query(self._get_sparql_examples_query()):
-            docs.append(self._create_document(row, prefix_map))
-        return docs
-
-    def _create_document(self, row: Any, prefix_map: Dict[str, str]) -> Document:
-        """Create a Document object from a query result row."""
-        query = self._remove_a_tags(str(row.query))
-        comment = str(row.comment)
-        # Add prefixes to query if not already present
-        for prefix, namespace in prefix_map.items():
-            prefix_str = f"PREFIX {prefix}: <{namespace}>"
-            if not re.search(prefix_str, query) and re.search(f"[(| |\u00a0|/]{prefix}:", query):
-                query = f"{prefix_str}\n{query}"
-        parsed_query = prepareQuery(query)
+        # Deduplicate client-side, cheaper than a DISTINCT sort on the endpoint
+        pairs: List[Tuple[str, str]] = list(
+            dict.fromkeys((str(row.comment), str(row.query)) for row in example_rows.result())
+        )
+        for comment, query in pairs:
+            yield self._create_document(comment, self._remove_a_tags(query), prefix_map, preamble)
+
+    def load(self) -> List[Document]:
+        """Load and return documents (SPARQL query examples) from the SPARQL endpoint."""
+        return list(self.lazy_load())
+
+    def _create_document(self, comment: str, query: str, prefix_map: Dict[str, str], preamble: str) -> Document:
+        """Create a Document object from an example comment and query."""
+        # Prepend the declared prefixes; endpoints ignore unused PREFIXes at negligible
+        # cost, so a substring check replaces scanning the query for prefix usage
+        if "PREFIX" not in query[:200]:
+            query = preamble + query
+        else:
+            # The query declares some prefixes itself, only add the missing ones
+            missing = [
+                f"PREFIX {prefix}: <{namespace}>"
+                for prefix, namespace in prefix_map.items()
+                if f"PREFIX {prefix}:" not in query
+            ]
+            if missing:
+                query = "\n".join([*missing, query])
+        type_match = _QUERY_TYPE_PATTERN.match(query)
+        query_type = _QUERY_TYPES[type_match.group(1).upper()] if type_match else "SelectQuery"
         return Document(
             page_content=comment,
             metadata={
                 "comment": comment,
                 "query": query,
                 "endpoint_url": self.endpoint_url,
-                "query_type": parsed_query.algebra.name,
+                "query_type": query_type,
             },
         )
 
-    def _get_sparql_examples_query(self) -> str:
-        """Query to extract SPARQL query examples"""
-        return """PREFIX sh: <http://www.w3.org/ns/shacl#>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-SELECT DISTINCT ?comment ?query
-WHERE {
-    ?sq a sh:SPARQLExecutable ;
-        rdfs:label|rdfs:comment ?comment ;
-        sh:select|sh:ask|sh:construct|sh:describe ?query .
-}"""
-
-    def _get_prefixes_query(self) -> str:
-        """Query to extract prefixes"""
-        return """PREFIX sh: <http://www.w3.org/ns/shacl#>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-
-SELECT DISTINCT ?prefix ?namespace
-WHERE {
-    [] sh:namespace ?namespace ;
-        sh:prefix ?prefix .
-} ORDER BY ?prefix"""
-
     def _remove_a_tags(self, text: str) -> str:
-        """Remove <a> tags from a string."""
-        # Use re.sub to replace the <a> tags with the content inside them
-        return re.sub(self.atag_pattern, r"\1", text)
+        """Remove <a> tags from a string, keeping the content inside them."""
+        return self.atag_pattern.sub(r"\1", text)
@@ -3,7 +3,8 @@ from langchain_rdf import OntologyLoader, SparqlExamplesLoader, __version__
 
 def test_ontology_loader_sio():
     """Test the ontology loader with the SIO ontology."""
-    loader = OntologyLoader("https://semanticscience.org/ontology/sio.owl", format="xml")
+    # Caching disabled so the parsing and extraction are always exercised
+    loader = OntologyLoader("https://semanticscience.org/ontology/sio.owl", format="xml", use_cache=False)
     documents = loader.load()
     # print(documents)
     assert len(documents) >= 10
@@ -19,8 +20,9 @@ def test_sparql_examples_loader_uniprot():
 
 def test_sparql_examples_loader_error_nextprot():
     """Test the SPARQL queries examples loader with the UniProt endpoint."""
+    loader = SparqlExamplesLoader("https://sparql.nextprot.org/")
     try:
-        _loader = SparqlExamplesLoader("https://sparql.nextprot.org/")
+        loader.load()
         raise AssertionError("Should have raised an error")
     except ValueError as e:
         assert "Could not query the provided endpoint at" in str(e)